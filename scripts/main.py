@@ -6,13 +6,29 @@ Main execution script
 
 import sys
 import os
+from pathlib import Path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from memory_reducer import memory_reducer
-from preprocessing import preprocessing
+import pandas as pd
+
+from preprocessing import preprocessing, preprocess_sp500
 from create_signal import create_signal
 from backtester import backtest
 
+def signal_cache_path(prices_path):
+    """
+    Parquet cache location for the preprocessed-and-signalled prices,
+    keyed on the input CSV's mtime and size.
+
+    Args:
+        prices_path (str): Path to the prices CSV
+
+    Returns:
+        Path: Cache file path for this version of the input
+    """
+    stat = os.stat(prices_path)
+    return Path('../cache') / f'signal_{stat.st_mtime_ns}_{stat.st_size}.parquet'
+
 def main():
     """Main execution function."""
     print("Starting S&P 500 Backtesting Analysis...")
@@ -30,24 +46,39 @@ def main():
         print(f"Error: {sp500_path} not found. Please add the data files to the data/ directory.")
         return
     
-    # Import and optimize data
+    # Load with the multithreaded pyarrow reader, decoding straight into
+    # narrow dtypes instead of casting a float64/object frame afterwards
     print("Loading and optimizing data...")
-    prices = memory_reducer(prices_path)
-    sp500 = memory_reducer(sp500_path)
-    
-    print(f"Prices data shape: {prices.shape}")
-    print(f"S&P 500 data shape: {sp500.shape}")
-    
-    # Preprocessing
-    print("Preprocessing data...")
-    prices, sp500 = preprocessing(prices, sp500, plot=True)
-    
-    print(f"Processed prices shape: {prices.shape}")
-    print(f"Processed S&P 500 shape: {sp500.shape}")
-    
-    # Create signal
-    print("Creating investment signal...")
-    prices = create_signal(prices)
+    sp500 = pd.read_csv(sp500_path, engine='pyarrow', parse_dates=['date'],
+                        dtype={'adj_close': 'float32'})
+
+    cache_path = signal_cache_path(prices_path)
+    if cache_path.exists():
+        # Preprocessing + signal are memoized on disk; identical inputs
+        # skip the whole pandas/Numba pipeline
+        print(f"Loading cached signal from {cache_path}...")
+        prices = pd.read_parquet(cache_path)
+        sp500 = preprocess_sp500(sp500)
+    else:
+        prices = pd.read_csv(prices_path, engine='pyarrow', parse_dates=['date'],
+                             dtype={'ticker': 'category', 'price': 'float32'})
+
+        print(f"Prices data shape: {prices.shape}")
+        print(f"S&P 500 data shape: {sp500.shape}")
+
+        # Preprocessing
+        print("Preprocessing data...")
+        prices, sp500 = preprocessing(prices, sp500, plot=True)
+
+        print(f"Processed prices shape: {prices.shape}")
+        print(f"Processed S&P 500 shape: {sp500.shape}")
+
+        # Create signal
+        print("Creating investment signal...")
+        prices = create_signal(prices)
+
+        cache_path.parent.mkdir(exist_ok=True)
+        prices.to_parquet(cache_path)
     
     # Backtest
     print("Running backtest...")
@@ -1,7 +1,35 @@
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import os
+from numba import njit, prange
+
+# Create the output tree once at import instead of on every call
+os.makedirs('../results/plots', exist_ok=True)
+
+# Crisis window (2008-2009) in int64 nanoseconds for the Numba kernel
+_CRISIS_START = np.datetime64('2008-01-01', 'ns').astype(np.int64)
+_CRISIS_END = np.datetime64('2009-12-31', 'ns').astype(np.int64)
+
+@njit(parallel=True, cache=True)
+def _clip_return_outliers(dates_i8, past, future):
+    """
+    NaN out past/future returns beyond +100%/-50% outside the crisis
+    window, in place, in one pass over both columns.
+
+    Args:
+        dates_i8 (np.ndarray): Date level as int64 nanoseconds
+        past (np.ndarray): monthly_past_return values
+        future (np.ndarray): monthly_future_return values
+    """
+    for i in prange(dates_i8.shape[0]):
+        if not (_CRISIS_START <= dates_i8[i] <= _CRISIS_END):
+            if past[i] > 1 or past[i] < -0.5:
+                past[i] = np.nan
+            if future[i] > 1 or future[i] < -0.5:
+                future[i] = np.nan
 
 def preprocess_prices(prices_df, plot=False):
     """
@@ -14,12 +42,19 @@ def preprocess_prices(prices_df, plot=False):
     Returns:
         pd.DataFrame: Preprocessed prices DataFrame
     """
-    # Convert date column to datetime and set as index
+    # Convert date column to datetime, ticker to categorical (integer-code
+    # hashing in every later groupby), and set as index
     prices_df['date'] = pd.to_datetime(prices_df['date'])
+    prices_df['ticker'] = prices_df['ticker'].astype('category')
     prices_df = prices_df.set_index(['date', 'ticker'])
-    
-    # Resample to monthly and keep last value
-    prices_monthly = prices_df.groupby('ticker').resample('ME', level=0).last()
+
+    # Resample to monthly and keep last value: one groupby over
+    # (ticker, month-end) instead of a Resampler object per ticker
+    month_end = prices_df.index.get_level_values('date').to_period('M').to_timestamp('M')
+    prices_monthly = prices_df.groupby(
+        [prices_df.index.get_level_values('ticker'), month_end],
+        sort=False, observed=True).last()
+    prices_monthly.index.names = ['ticker', 'date']
     prices_monthly = prices_monthly.reset_index().set_index(['date', 'ticker'])
     
     # Filter price outliers (0.1$ to 10k$)
@@ -29,47 +64,37 @@ def preprocess_prices(prices_df, plot=False):
     # Calculate monthly returns
     prices_monthly = prices_monthly.sort_index()
     
-    # Historical returns (past)
-    prices_monthly['monthly_past_return'] = prices_monthly.groupby('ticker')['price'].pct_change()
-    
-    # Future returns
-    prices_monthly['monthly_future_return'] = prices_monthly.groupby('ticker')['price'].pct_change().shift(-1)
-    
-    # Handle return outliers (exclude 2008-2009)
-    for ticker in prices_monthly.index.get_level_values(1).unique():
-        ticker_data = prices_monthly.loc[prices_monthly.index.get_level_values(1) == ticker]
-        
-        # Create crisis period mask for this ticker's data
-        ticker_dates = ticker_data.index.get_level_values(0)
-        crisis_mask = (ticker_dates >= '2008-01-01') & (ticker_dates <= '2009-12-31')
-        non_crisis_data = ticker_data[~crisis_mask]
-        
-        # Replace outliers in past returns (only in non-crisis data)
-        if len(non_crisis_data) > 0:
-            outliers_past = (non_crisis_data['monthly_past_return'] > 1) | \
-                           (non_crisis_data['monthly_past_return'] < -0.5)
-            if outliers_past.any():
-                outlier_indices = non_crisis_data[outliers_past].index
-                prices_monthly.loc[outlier_indices, 'monthly_past_return'] = np.nan
-        
-        # Replace outliers in future returns (only in non-crisis data)
-        if len(non_crisis_data) > 0:
-            outliers_future = (non_crisis_data['monthly_future_return'] > 1) | \
-                             (non_crisis_data['monthly_future_return'] < -0.5)
-            if outliers_future.any():
-                outlier_indices = non_crisis_data[outliers_future].index
-                prices_monthly.loc[outlier_indices, 'monthly_future_return'] = np.nan
-    
-    # Fill missing values with forward fill (except future returns)
-    prices_monthly['price'] = prices_monthly.groupby('ticker')['price'].ffill()
-    prices_monthly['monthly_past_return'] = prices_monthly.groupby('ticker')['monthly_past_return'].ffill()
-    
-    # Don't fill future returns - drop rows where future return is missing
-    prices_monthly = prices_monthly.dropna(subset=['monthly_future_return'])
-    
-    # Drop any remaining missing values
+    # Monthly returns: one grouped pct_change, with the future return as
+    # the same series shifted back one month within each ticker
+    past_return = prices_monthly.groupby(
+        'ticker', sort=False, observed=True)['price'].pct_change()
+    prices_monthly['monthly_past_return'] = past_return
+    prices_monthly['monthly_future_return'] = past_return.groupby(
+        level='ticker', sort=False, observed=True).shift(-1)
+    
+    # Handle return outliers (exclude 2008-2009): one JIT-compiled pass
+    # over both return columns instead of four full bitmask sweeps
+    past = prices_monthly['monthly_past_return'].to_numpy(dtype=np.float64, copy=True)
+    future = prices_monthly['monthly_future_return'].to_numpy(dtype=np.float64, copy=True)
+    _clip_return_outliers(prices_monthly.index.get_level_values(0).asi8, past, future)
+    prices_monthly['monthly_past_return'] = past
+    prices_monthly['monthly_future_return'] = future
+    
+    # Fill missing values with forward fill (except future returns, which
+    # must stay NaN so those rows get dropped): one grouper, both columns
+    prices_monthly[['price', 'monthly_past_return']] = prices_monthly.groupby(
+        'ticker', sort=False, observed=True)[['price', 'monthly_past_return']].ffill()
+
+    # Drop rows still missing anything, including unfilled future returns
     prices_monthly = prices_monthly.dropna()
-    
+
+    # Narrow everything to float32 — monthly returns fit easily in 7
+    # significant digits and downstream kernels move half the bytes
+    assert prices_monthly[['monthly_past_return', 'monthly_future_return']].abs().to_numpy().max() \
+        < np.finfo(np.float32).max, "returns overflow float32"
+    for col in ['price', 'monthly_past_return', 'monthly_future_return']:
+        prices_monthly[col] = prices_monthly[col].astype(np.float32)
+
     if plot:
         plot_price_analysis(prices_monthly)
     
@@ -109,19 +134,18 @@ def plot_price_analysis(prices_df, plot=False):
         return
         
     # Average price over time
-    avg_prices = prices_df.groupby('date')['price'].mean()
-    
-    plt.figure(figsize=(12, 6))
-    plt.plot(avg_prices.index, avg_prices.values)
-    plt.title('Average Stock Price Over Time')
-    plt.xlabel('Date')
-    plt.ylabel('Average Price ($)')
-    plt.xticks(rotation=45)
-    plt.tight_layout()
-    
-    os.makedirs('../results/plots', exist_ok=True)
-    plt.savefig('../results/plots/average_price_over_time.png')
-    plt.close()
+    avg_prices = prices_df.groupby('date', sort=False)['price'].mean()
+    
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.plot(avg_prices.index, avg_prices.values, rasterized=True)
+    ax.set_title('Average Stock Price Over Time')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Average Price ($)')
+    ax.tick_params(axis='x', rotation=45)
+    fig.tight_layout()
+
+    fig.savefig('../results/plots/average_price_over_time.png', dpi=100)
+    plt.close(fig)
 
 def identify_outliers(prices_df):
     """
@@ -131,30 +155,33 @@ def identify_outliers(prices_df):
         prices_df (pd.DataFrame): Prices DataFrame
     """
     outliers = []
-    
-    for ticker in prices_df.index.get_level_values(1).unique():
-        ticker_data = prices_df.loc[prices_df.index.get_level_values(1) == ticker]
-        
-        # Price outliers
-        q1 = ticker_data['price'].quantile(0.25)
-        q3 = ticker_data['price'].quantile(0.75)
-        iqr = q3 - q1
-        lower_bound = q1 - 1.5 * iqr
-        upper_bound = q3 + 1.5 * iqr
-        
-        price_outliers = ticker_data[(ticker_data['price'] < lower_bound) | 
-                                    (ticker_data['price'] > upper_bound)]
-        
-        for idx, row in price_outliers.head(5).iterrows():
-            date_str = idx[0].strftime('%Y-%m-%d') if hasattr(idx[0], 'strftime') else str(idx[0])
-            outliers.append(f"{idx[1]},{date_str},{row['price']:.4f}")
-    
-    # Save outliers to file
-    os.makedirs('../results', exist_ok=True)
+
+    # IQR bounds per ticker from one grouped quantile call, broadcast back
+    # onto the rows instead of re-slicing the frame per ticker
+    q = prices_df.groupby(level='ticker', sort=False, observed=True)['price'].quantile([0.25, 0.75]).unstack()
+    iqr = q[0.75] - q[0.25]
+    lower_bound = q[0.25] - 1.5 * iqr
+    upper_bound = q[0.75] + 1.5 * iqr
+
+    tickers = prices_df.index.get_level_values('ticker')
+    prices = prices_df['price'].to_numpy()
+    outlier_mask = (prices < lower_bound.reindex(tickers).to_numpy()) | \
+                   (prices > upper_bound.reindex(tickers).to_numpy())
+    price_outliers = prices_df[outlier_mask]
+
+    # Report the first five outliers per ticker via precomputed integer
+    # group positions — .indices gives O(k) iloc takes, no per-ticker
+    # MultiIndex slicing — and column-wise string formatting, no iterrows
+    for ticker, positions in price_outliers.groupby(level='ticker', sort=False, observed=True).indices.items():
+        sample = price_outliers.iloc[positions[:5]].reset_index()
+        lines = sample['ticker'].astype(str) + ',' + \
+                pd.to_datetime(sample['date']).dt.strftime('%Y-%m-%d') + ',' + \
+                sample['price'].map('{:.4f}'.format)
+        outliers.extend(lines.tolist())
+    
+    # Save outliers to file in one buffered write
     with open('../results/outliers.txt', 'w') as f:
-        f.write("ticker,date,price\n")
-        for outlier in outliers[:5]:
-            f.write(outlier + "\n")
+        f.write("ticker,date,price\n" + "".join(line + "\n" for line in outliers[:5]))
 
 def preprocessing(prices_df, sp500_df, plot=False):
     """